@@ -1,3 +1,4 @@
+from functools import lru_cache
 import numpy as np
 
 def penalty_function(x, central_point=20000, max_value=0.5, scale=2000):
@@ -5,21 +6,22 @@ def penalty_function(x, central_point=20000, max_value=0.5, scale=2000):
     Calculate 'penalty' value, using a sigmoid function.
     
     Parameters:
-        x (float): The current balance/value to evaluate.
+        x (float or np.ndarray): The current balance/value to evaluate.
         central_point(float, optional): The centre of sigmoid function, defaults to 20,000.
         max_value(float, optional): The maximum penalty value, defaults to 0.5.
         scale(float, optional): Controls steepness of sigmoid curve, defaults to 2000.
         
     Returns:
-        float: The calculated penalty between 0 and max_value.
+        float or np.ndarray: The calculated penalty between 0 and max_value.
     """
     
     #Shift the x position so the 'steep' part centres are central point
     #Divide by scale to avoid runtime warning since using very large numbers generally (>1e4)
-    shifted_x = (-x+central_point)/scale
+    shifted_x = (x-central_point)/scale
     
-    #Apply the sigmoid function around the shifted x
-    sigmoid = 1 / (1 + np.e**(shifted_x))
+    #Apply the sigmoid function around the shifted x, written with tanh so it
+    #cannot overflow for balances far from the central point
+    sigmoid = 0.5 * (1 + np.tanh(0.5*shifted_x))
     
     #Further scale output based on maximal penalty function
     #In base case, the middle penalty function 0.25, which matches the
@@ -28,6 +30,76 @@ def penalty_function(x, central_point=20000, max_value=0.5, scale=2000):
     
     return output
 
+@lru_cache(maxsize=16)
+def growth_factors(interest_rate, num_years):
+    """
+    Calculate the balance after each year from contributing 1 per year.
+    
+    Cached, since sweeps reuse the same interest rate and number of years for every simulation.
+    
+    Parameters:
+        interest_rate(float): Annual interest rate multiplier (e.g. 1.1 for 10%)
+        num_years(int): Number of years to simulate.
+        
+    Returns:
+        np.ndarray: Read-only array of r + r^2 + ... + r^n for n = 1 to num_years.
+    """
+    
+    growth = np.cumsum(np.power(float(interest_rate), np.arange(1, num_years + 1)))
+    
+    #Cached array is shared, so make it read-only
+    growth.setflags(write=False)
+    
+    return growth
+
+def balance_series(yearly_contribution, interest_rate, num_years):
+    """
+    Calculate yearly balances of an account with a fixed yearly contribution.
+    
+    Parameters:
+        yearly_contribution(float or np.ndarray): Amount contributed annually, an array
+            gives one row of balances per contribution.
+        interest_rate(float): Annual interest rate multiplier (e.g. 1.1 for 10%)
+        num_years(int): Number of years to simulate.
+        
+    Returns:
+        np.ndarray: Balance at end of each year, with the years along the last axis.
+    """
+    
+    #Balance after n years is C*(r + r^2 + ... + r^n)
+    return np.asarray(yearly_contribution, dtype=float)[..., np.newaxis] * growth_factors(float(interest_rate), int(num_years))
+
+def emigration_adjusted(money, emigration_prob):
+    """
+    Apply the emigration-weighted penalty to LISA balances.
+    
+    Parameters:
+        money(float or np.ndarray): LISA balances to adjust.
+        emigration_prob(float or np.ndarray): Probability (0-1) of emigration, scaling penalty impact.
+        
+    Returns:
+        np.ndarray: Balances after the expected penalty is taken off.
+    """
+    
+    money = np.asarray(money)
+    
+    #Penalty rate from the sigmoid function, scaled by emigration probability
+    return money * (1 - emigration_prob * penalty_function(money))
+
+def government_bonus(contribution):
+    """
+    Calculate the government bonus paid on a yearly LISA contribution.
+    
+    Parameters:
+        contribution(float or np.ndarray): Amount deposited into the LISA in a year.
+        
+    Returns:
+        float or np.ndarray: Bonus of 25% of the contribution, capped at 1000.
+    """
+    
+    #Max contribution is 4000, so bonus is capped at 1000
+    return np.minimum(1000, 0.25*contribution)
+
 class Account:
     """
     Base class for a savings account.
@@ -56,20 +128,12 @@ class Account:
             num_years (int): Number of years to simulate.
             
         Returns:
-            list of float: Account balance at end of each year.
+            np.ndarray: Account balance at end of each year.
         """
         
         self.num_years = num_years
         
-        total_money = 0 #Initial account balance
-        total_money_per_year = [] #Used to store balance year by year
-        
-        for i in range(num_years):
-            #Apply yearly contribution, and calculate interest
-            total_money = (total_money + self.yearly_contribution) * self.interest_rate
-            total_money_per_year.append(total_money)
-        
-        return(total_money_per_year)
+        return balance_series(self.yearly_contribution, self.interest_rate, num_years)
     
 class ISA(Account):
     """
@@ -94,7 +158,7 @@ class ISA(Account):
             num_years (int): Number of years to simulate.
         
         Returns:
-            list of float: Account balance at end of each year.
+            np.ndarray: Account balance at end of each year.
         """
         return super().compound_interest(num_years)
             
@@ -112,8 +176,7 @@ class LISA(Account):
             interest_rate(float): Annual interest rate multiplier
         """
         #The adjusted contribution is 25% of deposited amount each year
-        #Max contribution is 4000, so bonus is capped at 1000
-        adjusted_contribution = yearly_contribution + min(1000, 0.25*yearly_contribution)
+        adjusted_contribution = yearly_contribution + government_bonus(yearly_contribution)
         
         super().__init__(adjusted_contribution, interest_rate) 
         
@@ -125,7 +188,7 @@ class LISA(Account):
             num_years (int): Number of years to simulate.
         
         Returns:
-            list of float: Account balance at end of each year.
+            np.ndarray: Account balance at end of each year.
         """
         return super().compound_interest(num_years)
     
@@ -134,21 +197,10 @@ class LISA(Account):
         Adjust emigration-based penalty to yearly balances.
         
         Parameters:
-            money_list(list of float): Account balances per year.
+            money_list(array-like of float): Account balances per year.
             emigration_prob(float): Probability (0-1) of emigration, scaling penalty impact.
             
         Returns:
-            list of float: Adjusted balances based on penalty.
+            np.ndarray: Adjusted balances based on penalty.
         """
-        corrected_money = [] #List to store balances after penalty adjustment
-        
-        for money in money_list:
-            #Calculate the penalty rate based on current balance for sigmoid function
-            penalty = penalty_function(money)
-            
-            #Further scale the penalty based on emigration probabilty
-            corrected_value = money * (1 - emigration_prob * penalty)
-            
-            corrected_money.append(corrected_value)
-            
-        return corrected_money
+        return emigration_adjusted(money_list, emigration_prob)
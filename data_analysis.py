@@ -1,6 +1,6 @@
 import numpy as np
 import matplotlib.pyplot as plt
-from portfolio import Portfolio, optimal_ratio, optimize_portfolio
+from portfolio import Portfolio
 
 
 class Visual_Analysis(Portfolio):
@@ -29,14 +29,64 @@ class Visual_Analysis(Portfolio):
         super().__init__(yearly_investment, interest_rate, lisa_ratios) 
         self.lisa_ratios = lisa_ratios
         self.emigration_probs = emigration_probs
+        self._grid_cache = {} # Simulation grids keyed by number of years and simulation inputs
+        
+    def simulation_grid(self, num_years):
+        """
+        Get total portfolio values for every LISA ratio and emigration probability.
+
+        The grid is computed once per number of years and reused by every plot. The cache
+        key includes the investment, interest rate, LISA cap, ratios and probabilities, so
+        changing any of those attributes recomputes the grid instead of reusing stale values.
+
+        Parameters:
+            num_years (int): Number of years to simulate.
+
+        Returns:
+            np.ndarray: Read-only portfolio values with shape (num_ratios, num_em_probs, num_years).
+        """
+        key = (num_years, self.yearly_investment, self.interest_rate, self.lisa_cap,
+               tuple(self.lisa_ratios), tuple(self.emigration_probs))
+        
+        if key not in self._grid_cache:
+            grid = self.run_simulation_batch(num_years, self.lisa_ratios, self.emigration_probs)
+            
+            # Plots share the cached grid
+            grid.setflags(write=False)
+            self._grid_cache[key] = grid
+            
+        return self._grid_cache[key]
+    
+    def limit_indices(self, num_items, num_values = 1):
+        """
+        Select the indices of a limited number of representative values.
+
+        If num_values == 1, returns the median index.
+        If num_values > 1, returns evenly spaced indices across the list, rounded to integers.
+        Returns an empty list if num_values exceeds num_items.
+
+        Parameters:
+            num_items (int): Length of the list being sampled.
+            num_values (int, optional): Number of indices to return. Default is 1.
+
+        Returns:
+            list or int: Selected indices or a single median index.
+        """
+        if num_values > num_items:
+            return[]
+        if num_values == 1:
+            # Return median index
+            return(int(0.5*num_items))
+        else:
+            # Generate evenly spaced indices
+            indices = np.linspace(0, num_items - 1, num_values)
+            return list(np.round(indices).astype(int))
         
     def limit_values(self, values_list, num_values = 1):
         """
         Select a limited number of representative values from a list.
 
-        If num_values == 1, returns the median value.
-        If num_values > 1, returns evenly spaced values across the list.
-        Returns an empty list if num_values exceeds list length.
+        Returns the values at the indices chosen by limit_indices.
 
         Parameters:
             values_list (list): List of values to sample from.
@@ -45,16 +95,12 @@ class Visual_Analysis(Portfolio):
         Returns:
             list or single value: Selected values or a single median value.
         """
-        if num_values > len(values_list):
-            return[]
-        if num_values == 1:
-            # Return median value
-            return(values_list[int(0.5*len(values_list))])
-        else:
-            # Generate evenly spaced indices and return corresponding values
-            indices = np.linspace(0,len(values_list) - 1, num_values)
-            indices = np.round(indices).astype(int)
+        indices = self.limit_indices(len(values_list), num_values)
+        if isinstance(indices, list):
+            # Values at evenly spaced indices (empty if too many were requested)
             return[values_list[i] for i in indices]
+        # Single median value
+        return(values_list[indices])
     
     def plot_yearly_investments(self, num_years, save_fig = False, num_lines_to_plot=5):
         """
@@ -66,7 +112,9 @@ class Visual_Analysis(Portfolio):
             num_lines_to_plot (int, optional): Number of allocation ratios to plot. Default is 5.
         """
         years = range(1, num_years+1)
-        em_prob = self.limit_values(self.emigration_probs, 1) # Get median emigration probability
+        em_idx = self.limit_indices(len(self.emigration_probs), 1) # Get median emigration probability
+        em_prob = self.emigration_probs[em_idx]
+        grid = self.simulation_grid(num_years)
         
         plt.figure(figsize=(10, 6))
         
@@ -79,10 +127,7 @@ class Visual_Analysis(Portfolio):
         
         # Plot portfolio growth for each selected LISA ratio
         for i in indices_to_plot:
-            ratio = self.lisa_ratios[i]
-            port = Portfolio(self.yearly_investment, self.interest_rate, ratio)
-            money_list = port.run_simulation(num_years, em_prob)
-            plt.plot(years, money_list, label = f"Ratio LISA to ISA: {self.lisa_ratios[i]:.2f}")
+            plt.plot(years, grid[i, em_idx], label = f"Ratio LISA to ISA: {self.lisa_ratios[i]:.2f}")
         
         plt.title(f"Total money over years given {em_prob*100:.1f}% emigration chance")
         plt.xlabel("Number of Years")
@@ -105,14 +150,11 @@ class Visual_Analysis(Portfolio):
             num_years (int): Number of years to simulate.
             save_fig (bool, optional): Whether to save the plot as an image. Default is False.
         """
-        results = []
-        em_prob = self.limit_values(self.emigration_probs, 1) # Median emigration probability
-        
-        # Run simulation for each LISA ratio and record final total money
-        for ratio in self.lisa_ratios:
-            port = Portfolio(self.yearly_investment, self.interest_rate, ratio)
-            money_list = port.run_simulation(num_years, em_prob)
-            results.append(money_list[-1])
+        em_idx = self.limit_indices(len(self.emigration_probs), 1) # Median emigration probability
+        em_prob = self.emigration_probs[em_idx]
+        
+        # Final total money for each LISA ratio
+        results = self.simulation_grid(num_years)[:, em_idx, -1]
             
         plt.figure(figsize=(10, 6))
         plt.plot(self.lisa_ratios, results)
@@ -134,14 +176,15 @@ class Visual_Analysis(Portfolio):
         """
         Plot the optimal LISA allocation ratio as a function of emigration probability.
     
-        Uses the `optimize_portfolio` function to find the best ratio for each emigration chance.
+        Takes the best ratio for each emigration chance from the cached simulation grid.
     
         Parameters:
             num_years (int): Number of years for simulation.
             save_fig (bool, optional): Whether to save the plot as an image. Default is False.
         """
         # Get list of best ratios optimized over emigration probabilities
-        list1 = optimize_portfolio(self.yearly_investment, self.interest_rate, num_years, self.lisa_ratios, self.emigration_probs)
+        final_values = self.simulation_grid(num_years)[:, :, -1]
+        list1 = np.asarray(self.lisa_ratios)[np.argmax(final_values, axis=0)]
         plt.figure(figsize=(10, 6))
         plt.plot(self.emigration_probs, list1)
         
@@ -170,8 +213,12 @@ class Visual_Analysis(Portfolio):
             save_fig (bool, optional): Whether to save the plot as an image. Default is False.
         """
         years = range(1, num_years+1)
-        em_probs_to_plot = self.limit_values(self.emigration_probs, num_em_probs_to_plot)
-        ratios_to_plot = self.limit_values(self.lisa_ratios, num_ratios_per_block)
+        em_idxs = self.limit_indices(len(self.emigration_probs), num_em_probs_to_plot)
+        ratio_idxs = self.limit_indices(len(self.lisa_ratios), num_ratios_per_block)
+        em_probs_to_plot = [self.emigration_probs[i] for i in em_idxs]
+        
+        # Portfolio values for the selected ratios and probabilities, shape (ratios, probs, years)
+        block = self.simulation_grid(num_years)[np.ix_(ratio_idxs, em_idxs)]
         
         # Get distinct colors for each emigration probability block
         color_map = plt.get_cmap("viridis", len(em_probs_to_plot))
@@ -181,9 +228,8 @@ class Visual_Analysis(Portfolio):
         # Plot lines for each combination of emigration probability and LISA ratio
         for i, em_prob in enumerate(em_probs_to_plot):
             color = color_map(i)
-            for j, ratio in enumerate(ratios_to_plot):
-                port = Portfolio(self.yearly_investment, self.interest_rate, ratio)
-                money_list = port.run_simulation(num_years, em_prob)
+            for j in range(len(ratio_idxs)):
+                money_list = block[j, i]
     
                 # Label only the first line per emigration block to keep legend clean
                 label = f"Emigration: {em_prob * 100:.0f}%" if j == 0 else None
@@ -216,8 +262,13 @@ class Visual_Analysis(Portfolio):
             save_fig (bool, optional): Whether to save the plot as an image. Default is False.
         """
         years = range(1, num_years+1)
-        em_probs_to_plot = self.limit_values(self.emigration_probs, num_em_probs_to_plot)
-        ratios_to_plot = self.limit_values(self.lisa_ratios, num_ratios_per_block)
+        em_idxs = self.limit_indices(len(self.emigration_probs), num_em_probs_to_plot)
+        ratio_idxs = self.limit_indices(len(self.lisa_ratios), num_ratios_per_block)
+        em_probs_to_plot = [self.emigration_probs[i] for i in em_idxs]
+        
+        # Average portfolio values year-by-year across the selected ratios, shape (probs, years)
+        block = self.simulation_grid(num_years)[np.ix_(ratio_idxs, em_idxs)]
+        avg_money_per_prob = block.mean(axis=0)
         
         color_map = plt.get_cmap("viridis", len(em_probs_to_plot))
         
@@ -226,19 +277,7 @@ class Visual_Analysis(Portfolio):
         # Compute and plot average portfolio values for each emigration probability
         for i, em_prob in enumerate(em_probs_to_plot):
             color = color_map(i)
-            temp_list=[]
-            for ratio in ratios_to_plot:
-                port = Portfolio(self.yearly_investment, self.interest_rate, ratio)
-                money_list = port.run_simulation(num_years, em_prob)
-                temp_list.append(money_list)
-            
-            # Average portfolio values year-by-year
-            avg_money = []
-            for year_idx in range(num_years):
-                year_sum = sum(temp_list[r][year_idx] for r in range(len(temp_list)))
-                avg_money.append(year_sum / len(temp_list))
-            
-            plt.plot(years, avg_money, label=f"Emigration Prob = {em_prob:.2f}", color=color)
+            plt.plot(years, avg_money_per_prob[i], label=f"Emigration Prob = {em_prob:.2f}", color=color)
             
         plt.title("Total Money Over Time for Averaged LISA ratios vs Emigration Probabilities")
         plt.xlabel("Years")
@@ -253,7 +292,7 @@ class Visual_Analysis(Portfolio):
     
         plt.show()
 
-    def plot_heatmap(self, num_years, save_fig=False, show_optimal_path=True):
+    def plot_heatmap(self, num_years, save_fig=False, show_optimal_path=True, verbose=False):
         """
         Generate a heatmap displaying final portfolio values across all LISA ratios and emigration probabilities.
     
@@ -263,25 +302,16 @@ class Visual_Analysis(Portfolio):
             num_years (int): Number of years to simulate.
             save_fig (bool, optional): Whether to save the heatmap as an image. Default is False.
             show_optimal_path (bool, optional): Whether to overlay the optimal ratio path. Default is True.
+            verbose (bool, optional): Whether to print the grid size being computed. Default is False.
     
         Returns:
             np.ndarray: Matrix of final portfolio values with shape (num_ratios, num_em_probs).
         """
-        print(f"Computing heatmap: {len(self.lisa_ratios)} ratios × {len(self.emigration_probs)} emigration probabilities...")
+        if verbose:
+            print(f"Computing heatmap: {len(self.lisa_ratios)} ratios × {len(self.emigration_probs)} emigration probabilities...")
         
-        # Initialize matrix to hold final portfolio values for each ratio/probability combination
-        results_matrix = np.zeros((len(self.lisa_ratios), len(self.emigration_probs)))
-        
-        # Populate matrix with final portfolio values
-        for i, ratio in enumerate(self.lisa_ratios):
-            for j, emigration_prob in enumerate(self.emigration_probs):
-                port = Portfolio(self.yearly_investment, self.interest_rate, ratio)
-                final_value = port.run_simulation(num_years, emigration_prob)[-1]
-                results_matrix[i, j] = final_value
-            
-            # Progress update every 10 ratios or on first iteration
-            if (i + 1) % 10 == 0 or i == 0:
-                print(f"Completed {i + 1}/{len(self.lisa_ratios)} ratios...")
+        # Final portfolio values for every ratio/probability combination
+        results_matrix = self.simulation_grid(num_years)[:, :, -1].copy()
         
         plt.figure(figsize=(10, 6))
         
@@ -303,10 +333,8 @@ class Visual_Analysis(Portfolio):
         
         # Overlay optimal LISA ratio path (optional)
         if show_optimal_path:
-            optimal_ratios = []
-            for j, emigration_prob in enumerate(self.emigration_probs):
-                best_ratio_idx = np.argmax(results_matrix[:, j])
-                optimal_ratios.append(self.lisa_ratios[best_ratio_idx])
+            best_ratio_idxs = np.argmax(results_matrix, axis=0)
+            optimal_ratios = np.asarray(self.lisa_ratios)[best_ratio_idxs]
             
             plt.plot(self.emigration_probs, optimal_ratios, 'r-', linewidth=2, 
                     label='Optimal Ratio Path', alpha=0.8)
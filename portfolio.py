@@ -1,6 +1,6 @@
 import numpy as np
 import matplotlib.pyplot as plt
-from accounts import LISA, ISA
+from accounts import LISA, ISA, balance_series, emigration_adjusted, government_bonus, penalty_function
 
 class Portfolio:
     """
@@ -52,7 +52,7 @@ class Portfolio:
             lisa_allocation = lisa_cap
             isa_allocation += excess_lisa_allocation
             
-            if (show_warning_message == True):
+            if show_warning_message:
                 print(f"LISA contribution in excess of £{lisa_cap} limit by £{excess_lisa_allocation}, " \
                       "moving excess to ISA ")
                     
@@ -68,7 +68,7 @@ class Portfolio:
             apply_penalty(bool): Whether to apply the LISA penalty for emigration.
             
         Returns:
-            list of float: Total portfolio value at the end of each year.
+            np.ndarray: Total portfolio value at the end of each year.
         """
         #Calculate the ISA/LISA contributions based on investment and ratio
         yearly_lisa_contribution, yearly_isa_contribution = self.allocate_funds()
@@ -86,9 +86,99 @@ class Portfolio:
             lisa_amount_list = lisa_account.apply_emigration_penalty(lisa_amount_list, emigration_prob)
         
         #Store yearly portfolio value (LISA + ISA)
-        self.total_money_list = [l + i for l, i in zip(lisa_amount_list, isa_amount_list)]
+        self.total_money_list = np.asarray(lisa_amount_list) + np.asarray(isa_amount_list)
         
         return(self.total_money_list)
+    
+    def run_simulation_batch(self, num_years, lisa_ratios, emigration_probs):
+        """
+        Simulate this portfolio's investment for many LISA ratios and emigration probabilities at once.
+
+        Parameters:
+            num_years(int): Number of years to simulate.
+            lisa_ratios(list of float): LISA allocation ratios to simulate, used instead of self.lisa_ratio.
+            emigration_probs(list of float): Emigration probabilities to simulate.
+            
+        Returns:
+            np.ndarray: Total portfolio value with shape (num_ratios, num_em_probs, num_years).
+        """
+        return simulate_grid(self.yearly_investment, self.interest_rate, num_years,
+                             lisa_ratios, emigration_probs, self.lisa_cap)
+
+def simulate_balances(yearly_investment, interest_rate, num_years, lisa_ratios, lisa_cap = 4000):
+    """
+    Simulate yearly LISA and ISA balances for many LISA ratios at once, before any penalty.
+
+    Parameters:
+        yearly_investment(float): Total amount invested annually.
+        interest_rate(float): Annual interest rate multiplier.
+        num_years(int): Number of years to simulate.
+        lisa_ratios(list of float): List of LISA allocation ratios.
+        lisa_cap(float, optional): Annual LISA contribution cap. Default is 4000.
+
+    Returns:
+        tuple: (lisa_balances, isa_balances), each with shape (num_ratios, num_years).
+    """
+    ratios = np.asarray(lisa_ratios, dtype=float)
+    
+    #Split yearly investment for every ratio, moving anything over the cap into the ISA
+    lisa_allocation = np.minimum(yearly_investment * ratios, lisa_cap)
+    isa_allocation = yearly_investment - lisa_allocation
+    
+    lisa_balances = balance_series(lisa_allocation + government_bonus(lisa_allocation), interest_rate, num_years)
+    isa_balances = balance_series(isa_allocation, interest_rate, num_years)
+    
+    return(lisa_balances, isa_balances)
+
+def simulate_final_values(yearly_investment, interest_rate, num_years, lisa_ratios, lisa_cap = 4000):
+    """
+    Simulate final LISA and ISA balances for many LISA ratios at once, before any penalty.
+
+    Parameters:
+        yearly_investment(float): Total amount invested annually.
+        interest_rate(float): Annual interest rate multiplier.
+        num_years(int): Number of years to simulate.
+        lisa_ratios(list of float): List of LISA allocation ratios.
+        lisa_cap(float, optional): Annual LISA contribution cap. Default is 4000.
+
+    Returns:
+        tuple: (lisa_final, isa_final), each with shape (num_ratios,).
+    """
+    lisa_balances, isa_balances = simulate_balances(yearly_investment, interest_rate, num_years, lisa_ratios, lisa_cap)
+    
+    return(lisa_balances[:, -1], isa_balances[:, -1])
+
+def simulate_grid(yearly_investment, interest_rate, num_years, lisa_ratios, emigration_probs, lisa_cap = 4000):
+    """
+    Simulate every combination of LISA ratio and emigration probability at once.
+    
+    Equivalent to calling Portfolio.run_simulation for each pair, but evaluated
+    with NumPy broadcasting instead of one simulation per pair.
+
+    Parameters:
+        yearly_investment(float): Total amount invested annually.
+        interest_rate(float): Annual interest rate multiplier.
+        num_years(int): Number of years to simulate.
+        lisa_ratios(list of float): List of LISA allocation ratios.
+        emigration_probs(list of float): List of emigration probabilities.
+        lisa_cap(float, optional): Annual LISA contribution cap. Default is 4000.
+
+    Returns:
+        np.ndarray: Total portfolio value with shape (num_ratios, num_em_probs, num_years).
+    """
+    probs = np.asarray(emigration_probs, dtype=float)
+    
+    #Yearly balances for every ratio, shape (num_ratios, num_years)
+    lisa_balances, isa_balances = simulate_balances(yearly_investment, interest_rate, num_years, lisa_ratios, lisa_cap)
+    
+    #Penalty depends on the LISA balance only, so broadcast probabilities along a middle axis.
+    #Same as emigration_adjusted, but built up in place so only one full-size array is allocated.
+    total = probs[np.newaxis, :, np.newaxis] * penalty_function(lisa_balances)[:, np.newaxis, :]
+    np.subtract(1, total, out=total)
+    total *= lisa_balances[:, np.newaxis, :]
+    total += isa_balances[:, np.newaxis, :]
+    
+    return total
 
 def optimal_ratio(yearly_investment, interest_rate, num_years, lisa_ratios, emigration_prob, print_result=False):
     """
@@ -105,11 +195,9 @@ def optimal_ratio(yearly_investment, interest_rate, num_years, lisa_ratios, emig
     Returns:
         float: The optimal LISA allocation ratio.
     """
-    results = []
-    
-    for i in range(len(lisa_ratios)):
-        portfolio = Portfolio(yearly_investment, interest_rate, lisa_ratios[i])
-        results.append(portfolio.run_simulation(num_years, emigration_prob)[-1])
+    #Final portfolio value for every ratio, without building any Portfolio objects
+    lisa_final, isa_final = simulate_final_values(yearly_investment, interest_rate, num_years, lisa_ratios)
+    results = emigration_adjusted(lisa_final, emigration_prob) + isa_final
         
     best_value_index = np.argmax(results)
     best_value = results[best_value_index]
@@ -133,23 +221,24 @@ def optimize_portfolio(yearly_investment, interest_rate, num_years, lisa_ratios,
         emigration_probs(list of float): List of emigration probabilities to test.
 
     Returns:
-        list of float: Best LISA ratios corresponding to emigration probability.
+        np.ndarray: Best LISA ratios corresponding to emigration probability.
     """
-    best_ratios = []
-    for prob in emigration_probs:
-        best_ratio = optimal_ratio(
-            yearly_investment, 
-            interest_rate, 
-            num_years, 
-            lisa_ratios, 
-            emigration_prob = prob)
-        best_ratios.append(best_ratio)
+    lisa_final, isa_final = simulate_final_values(yearly_investment, interest_rate, num_years, lisa_ratios)
+    probs = np.asarray(emigration_probs, dtype=float)
+    
+    #Compounding is shared by every probability, only the penalty is broadcast across them
+    final_values = emigration_adjusted(lisa_final[:, np.newaxis], probs[np.newaxis, :])
+    final_values += isa_final[:, np.newaxis]
+    
+    #Best ratio index for each emigration probability
+    best_ratio_idxs = np.argmax(final_values, axis=0)
+    best_ratios = np.asarray(lisa_ratios)[best_ratio_idxs]
     return(best_ratios)
 
 
 
-#lisa_ratios = np.arange(0,0.401,0.01)
-#emigration_probs = np.arange(0,1.01,0.01)
+#lisa_ratios = np.linspace(0, 0.4, 41)
+#emigration_probs = np.linspace(0, 1, 101)
 
 #y = optimize_portfolio(10000, 1.1, 5, lisa_ratios, emigration_probs)
 